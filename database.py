@@ -21,15 +21,30 @@ class MongoDatabase:
 		self.db = self.client[client]
 
 
-	def read_collection(self, collection):
+	def read_collection(self, collection, projection = None, batch_size = None):
 
 		"""
-			Read all documents in a certain collection
+			Read all documents in a certain collection, optionally only returning the fields in projection and fetching batch_size documents per round-trip
 		"""
 
 		try:
-			return self.db[collection].find({}, no_cursor_timeout=True)
-		except Exception, e:
+			cursor = self.db[collection].find({}, projection, no_cursor_timeout=True)
+			if batch_size is not None:
+				cursor = cursor.batch_size(batch_size)
+			return cursor
+		except Exception as e:
+			logging.error("[{}] : {}".format(sys._getframe().f_code.co_name,e))
+			exit(1)
+
+	def count_documents(self, collection, filter = None):
+
+		"""
+			Count the number of documents in a certain collection
+		"""
+
+		try:
+			return self.db[collection].count_documents(filter if filter is not None else {})
+		except Exception as e:
 			logging.error("[{}] : {}".format(sys._getframe().f_code.co_name,e))
 			exit(1)
 
@@ -42,7 +57,21 @@ class MongoDatabase:
 
 		try:
 			self.db[collection].insert_one(doc)
-		except Exception, e:
+		except Exception as e:
+			logging.error("[{}] : {}".format(sys._getframe().f_code.co_name,e))
+			exit(1)
+
+
+	def insert_many_to_collection(self, collection, docs):
+
+
+		"""
+			Insert many documents to a collection in a single bulk operation
+		"""
+
+		try:
+			self.db[collection].insert_many(docs, ordered = False, bypass_document_validation = True)
+		except Exception as e:
 			logging.error("[{}] : {}".format(sys._getframe().f_code.co_name,e))
 			exit(1)
 
@@ -58,6 +87,6 @@ class MongoDatabase:
 			self.db[collection].update({'_id' : ObjectId(doc['_id'])},
 									doc
 									,upsert = False)
-		except Exception, e:
+		except Exception as e:
 			logging.error("[{}] : {}".format(sys._getframe().f_code.co_name,e))
 			exit(1)
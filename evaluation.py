@@ -93,7 +93,7 @@ class Evaluation():
 
 			logging.info('Calculating coherence score: {}/{}'.format(i+1, len(M)))
 
-			print m
+			print(m)
 
 			# number of topics
 			k = m.split(os.sep)[2]
@@ -102,7 +102,7 @@ class Extraction():
 								folder = os.path.join(save_folder, journal, year), 
 								name = pdf_name,
 								overwrite = False)
-				except Exception, e:
+				except Exception as e:
 					logging.warning('[{}] : {}'.format(sys._getframe().f_code.co_name,e))
 					continue
 
@@ -57,7 +57,7 @@ def create_directory(name):
 		if not os.path.exists(name):
 			os.makedirs(name)
 			logging.info('Created directory: {}'.format(name))
-	except Exception, e:
+	except Exception as e:
 		logging.error("[{}] : {}".format(sys._getframe().f_code.co_name,e))
 		exit(1)
 
@@ -103,7 +103,7 @@ def return_html(url):
 		else:
 			logging.error("[return_html] invalid status code: {}".format(html.status_code))
 			return None
-	except Exception,e:
+	except Exception as e:
 		logging.error('[{}] : {}'.format(sys._getframe().f_code.co_name,e))
 		return None
 
@@ -142,7 +142,7 @@ def save_pdf(url, folder, name, overwrite = True):
 			with open('{}/{}'.format(folder, name), 'wb') as f:
 				f.write(response.content)
 
-		except Exception, e:
+		except Exception as e:
 			logging.error('[{}] : {}'.format(sys._getframe().f_code.co_name,e))
 			exit(1)
 
@@ -167,10 +167,10 @@ def pdf_to_plain(pdf_file):
 
 	try:
 
-		# use textract to convert PDF to plain text
-		return textract.process(pdf_file, encoding='utf8')
+		# use textract to convert PDF to plain text (textract returns bytes)
+		return textract.process(pdf_file, encoding='utf8').decode('utf8')
 
-	except Exception, e:
+	except Exception as e:
 		logging.error('[{}] : {}'.format(sys._getframe().f_code.co_name,e))
 		return None
 		
@@ -194,7 +194,7 @@ def read_directory(directory):
 	
 	try:
 		return glob2.glob(os.path.join(directory, '**' , '*.*'))
-	except Exception, e:
+	except Exception as e:
 		logging.error("[{}] : {}".format(sys._getframe().f_code.co_name,e))
 		exit(1)
 
@@ -212,7 +212,7 @@ def word_tokenizer(text):
 		# spacy_doc = nlp(text)
 		# Lemmatize tokens, remove punctuation and remove stopwords.
 		return  [token.lemma_ for token in text if token.is_alpha and not token.is_stop and len(token) > 1]
-	except Exception, e:
+	except Exception as e:
 		logging.error('[{}] : {}'.format(sys._getframe().f_code.co_name,e))
 		exit(1)
 
@@ -225,7 +225,7 @@ def get_bigrams(text):
 
 	try:
 		return list(nltk.bigrams(text.split()))
-	except Exception, e:
+	except Exception as e:
 		logging.error('[{}] : {}'.format(sys._getframe().f_code.co_name,e))
 		exit(1)
 
@@ -241,7 +241,7 @@ def named_entity_recognition(text):
 		ents = text.ents
 		entities = [str(entity).lower() for entity in ents if len(str(entity).split()) > 2]
 		return [ent.strip() for ent in entities if not any(char.isdigit() for char in ent) and all(ord(char) < 128 for char in ent)]
-	except Exception, e:
+	except Exception as e:
 		logging.error('[{}] : {}'.format(sys._getframe().f_code.co_name,e))
 		exit(1)
 
@@ -379,11 +379,11 @@ def save_csv(data, name, folder):
 		path = os.path.join(folder, name)
 
 		# save data to folder with name
-		with open(path, "w") as f:
+		with open(path, "w", newline='') as f:
 			writer = csv.writer(f, lineterminator='\n')
 			writer.writerows(data)
 
-	except Exception, e:
+	except Exception as e:
 
 		logging.error('[{}] : {}'.format(sys._getframe().f_code.co_name,e))
 		exit(1)
@@ -414,11 +414,11 @@ def read_csv(filename, folder = None):
 		csv.field_size_limit(sys.maxsize)
 		
 		# open the filename
-		with open(filename, 'rb') as f:
+		with open(filename, 'r', newline='') as f:
 			# create the reader
 			reader = csv.reader(f)
 			# return csv as list
 			return list(reader)
-	except Exception, e:
+	except Exception as e:
 		logging.error('[{}] : {}'.format(sys._getframe().f_code.co_name,e))
 		exit(1)
\ No newline at end of file
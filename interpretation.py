@@ -27,16 +27,23 @@
 
 # packages and modules
 import logging, sys, re, matplotlib
-from operator import itemgetter
+from collections import deque
+from multiprocessing import Pool, cpu_count
 import matplotlib.pyplot as plt
 import seaborn as sns
 sns.set_style("whitegrid")
 import pandas as pd
 import numpy as np
+from numba import njit, types
+from numba.typed import Dict
+from bson.binary import Binary
 from database import MongoDatabase
 from helper_functions import *
 
 
+# LDA model of an inference worker process (see init_inference_worker)
+worker_model = None
+
 
 class Interpretation():
 
@@ -53,9 +60,25 @@ class Interpretation():
 		# location to store tables to
 		self.table_save_folder = os.path.join('files', 'tables')
 
+		# location to store the topic matrix to, so it can be reused between runs
+		self.cache_folder = os.path.join('files', 'cache')
+
+		# topic distributions of all publications stacked into a (N,K) matrix, together with the year, journal and title of each publication (loaded on first use)
+		self._T = None
+		self._years = None
+		self._journals = None
+		self._titles = None
+		self._dominant = None
+
+		# label of each topic, looked up once when the topic matrix is loaded
+		self._labels = None
+
+		# cumulative topic distribution per year (calculated on first use)
+		self._year_topic = None
+
 	
 	def infer_document_topic_distribution(self, K = 10, dir_prior = 'auto', random_state = 42, num_pass = 15, iteration = 200, top_n_words = 10, 
-										models_folder = os.path.join('files', 'models'), lda_files_folder = os.path.join('files', 'lda')):
+										models_folder = os.path.join('files', 'models'), batch_size = 1000, num_workers = cpu_count()):
 
 
 		"""
@@ -82,50 +105,94 @@ class Interpretation():
 				only print out the top N high probability words
 			models_folder: os.path
 				location of created LDA models
-			lda_files_folder: os.path
-				location of LDA corpus and dictionary
 			save_folder: os.path
 				location to store the tables
+			batch_size: int
+				number of documents to infer the topic distribution for in a single call to the LDA model
+			num_workers: int
+				number of worker processes that infer the batches in parallel, each worker loads its own copy of the LDA model
 
 		"""
 
 		logging.info('Start {}'.format(sys._getframe().f_code.co_name))
 
-		# read dictionary and corpus
-		dictionary, corpus = get_dic_corpus(lda_files_folder)
+		# location of the LDA model according to parameters
+		model_location = os.path.join(models_folder, str(K), dir_prior, str(random_state), str(num_pass), str(iteration))
 
-		# load LDA model according to parameters
-		model = load_lda_model(os.path.join(models_folder, str(K), dir_prior, str(random_state), str(num_pass), str(iteration)))
+		# check if the LDA model exists before starting the workers
+		if not os.path.exists(os.path.join(model_location, 'lda.model')):
+			logging.error('LDA model not found')
+			exit(1)
 		
 		# load docs
-		D = self.db.read_collection(collection = 'publications_raw')
+		D = self.db.read_collection(collection = 'publications_raw', projection = {'tokens' : 1, 'journal' : 1, 'year' : 1, 'title' : 1, '_id' : 0}, batch_size = batch_size)
+
+		# total number of documents, only used to print the progress
+		total = self.db.count_documents(collection = 'publications_raw')
+
+		# batches of documents (meta data and tokens) to infer, the workers create the bag of words with the dictionary of the LDA model
+		batches = get_inference_batches(D, batch_size, total)
+
+		# remove the topic matrix from disk before the first insert, otherwise the plots will use the old topic distributions (also when inference fails halfway)
+		for cache_file in ['topics.npy', 'topics-meta.csv']:
+			if os.path.exists(os.path.join(self.cache_folder, cache_file)):
+				os.remove(os.path.join(self.cache_folder, cache_file))
+
+		# start the worker processes, each worker loads the LDA model once
+		pool = Pool(processes = num_workers, initializer = init_inference_worker, initargs = (model_location,))
+
+		# batches that are sent to the workers but not saved yet
+		pending = deque()
+
+		try:
+			for batch in batches:
 
-		# loop through all the documents to infer document-topics distribition
-		for i, d in enumerate(D):
+				# infer the document-topic distributions in parallel
+				pending.append(pool.apply_async(infer_batch_worker, (batch,)))
+
+				# only keep a limited number of batches in flight so not all documents end up in memory, the workers keep inferring while the oldest batch is saved
+				if len(pending) >= num_workers * 2:
+					self.save_document_topic_distribution(*pending.popleft().get())
+
+			# save the remaining batches
+			while pending:
+				self.save_document_topic_distribution(*pending.popleft().get())
+		finally:
+			pool.close()
+			pool.join()
+
+		# publications have changed, so the topic matrix needs to be loaded again
+		self._T = None
+		self._year_topic = None
+
+
+	def save_document_topic_distribution(self, batch_meta, gamma):
+
+		"""
+			Save the document-topic distributions of a batch of documents to the publications collection with a single bulk insert
+
+			Parameters
+			-----------
+			batch_meta: list of dictionaries
+				meta data (journal, year, title) of each document
+			gamma: np.array
+				array with a row per document that contains the normalized topic distribution
+		"""
 
-			# check if tokens are present; in case some documents couldn't properly be tokenized during pre-processing phase
-			if d.get('tokens') is not None:
+		# documents to insert into the database in one bulk operation
+		insert_docs = []
 
-				# print to console
-				print_doc_verbose(i, D.count(), d['journal'], d['year'], d['title'])
+		for meta, topics in zip(batch_meta, gamma):
 
-				# create bag of words from tokens
-				bow = model.id2word.doc2bow(d['tokens'])
+			# create a new document to add to the database, this time in a different collection
+			# the topic distribution is stored as the raw bytes of a float32 array where the index is the topic ID
+			insert_doc = dict(meta)
+			insert_doc['topics_vec'] = Binary(topics.astype(np.float32).tobytes())
 
-				# infer document-topic distribution
-				topics = model.get_document_topics(bow, per_word_topics = False)
+			insert_docs.append(insert_doc)
 
-				# convert to dictionary: here we convert the topic number to string because mongodb will complain otherwise
-				# you will get a message that documents can only have string keys
-				dic_topics = {}
-				for t in topics:
-					dic_topics[str(t[0])] = float(t[1])
-					
-				# create a new document to add to the database, this time in a different collection
-				insert_doc = {'journal': d['journal'], 'year' : d['year'], 'title' : d['title'], 'topics' : dic_topics}
-				
-				# save insert_doc to database within publications collection
-				self.db.insert_one_to_collection('publications', insert_doc)
+		# save insert_docs to database within publications collection
+		self.db.insert_many_to_collection('publications', insert_docs)
 
 
 	def get_document_title_per_topic(self):
@@ -141,26 +208,17 @@ class Interpretation():
 
 		logging.info('Start {}'.format(sys._getframe().f_code.co_name))
 
-		# load docs
-		D = self.db.read_collection(collection = 'publications')
+		# load the topic distributions of all documents
+		self._load_topic_matrix()
 
-		# empty list where we can append publication titles to
-		titles = []
+		# get the topic ID of the dominant topic of each document
+		dominant_topic_ids = self._dominant
+		# get the percentage of the dominant topic
+		dominant_topic_percentages = np.take_along_axis(self._T, dominant_topic_ids[:, np.newaxis], axis = 1).ravel()
 
-		# loop trough all the docs
-		for i, d in enumerate(D):
-			
-			# print to console
-			print_doc_verbose(i, D.count(), d['journal'], d['year'], d['title'])
-			
-			# get the dominant topic
-			dominant_topic = max(d['topics'].iteritems(), key = itemgetter(1))
-			# get the topic ID and percentage
-			dominant_topic_id, dominant_topic_percentage = dominant_topic[0], dominant_topic[1]
+		# create list with the year, title, journal, dominant topic ID and percentage of each document
+		titles = [list(row) for row in zip(self._years.tolist(), self._titles.tolist(), self._journals.tolist(), dominant_topic_ids.tolist(), dominant_topic_percentages.tolist())]
 
-			# append to list
-			titles.append([d['year'], d['title'], d['journal'], dominant_topic_id, dominant_topic_percentage])
-		
 		# save to CSV
 		save_csv(titles, 'titles-to-topics', folder = self.table_save_folder)
 
@@ -178,34 +236,25 @@ class Interpretation():
 
 		logging.info('Start {}'.format(sys._getframe().f_code.co_name))
 
-		# load docs
-		D = self.db.read_collection(collection = 'publications')
-
-		# create dictionary where we can obtain the topic distribution per year
-		year_to_topics = get_year_to_topics(D)
-
-		# calculate the cumulative topic distribution: basically the average distribution per year
-		year_to_cum_topics = get_year_to_cum_topics(year_to_topics)
-
-		# convert dictionary to pandas dataframe
-		df = pd.DataFrame.from_dict(year_to_cum_topics)
+		# get the cumulative topic distribution per year, with the topics as rows and the years as columns
+		df = self._year_topic_df().transpose()
 		
 		# create the plot
 		fig, axs = plt.subplots(2,5, figsize=(15, 10))
 		axs = axs.ravel()
 
-		# loop over each row of the dataframe
-		for index, row in df.iterrows():
+		# get year values
+		x = df.columns.to_numpy()
+		# get topic proportions, one row per topic
+		Y = df.to_numpy()
 
-			# get year values
-			x = df.columns.values.tolist()
-			# get topic proportions
-			y = row.tolist()
+		# loop over each row
+		for i in range(Y.shape[0]):
 
 			# add to plot
-			axs[index].plot(x, y, 'o--', color='black', linewidth=1, label="Topic prevalence")
-			axs[index].set_title(get_topic_label(index), fontsize=14)
-			axs[index].set_ylim([0,0.4])
+			axs[i].plot(x, Y[i], 'o--', color='black', linewidth=1, label="Topic prevalence")
+			axs[i].set_title(self._labels[i], fontsize=14)
+			axs[i].set_ylim([0,0.4])
 
 		# save plot
 		plt.savefig(os.path.join(self.plot_save_folder, plot_save_name), bbox_inches='tight')
@@ -224,23 +273,11 @@ class Interpretation():
 
 		logging.info('Start {}'.format(sys._getframe().f_code.co_name))
 
-		# load docs
-		D = self.db.read_collection(collection = 'publications')
-
-		# create dictionary where we can obtain the topic distribution per year
-		year_to_topics = get_year_to_topics(D)
-
-		# calculate the cumulative topic distribution: basically the average distribution per year
-		year_to_cum_topics = get_year_to_cum_topics(year_to_topics)
-
-		# convert dictionary to pandas dataframe
-		df = pd.DataFrame.from_dict(year_to_cum_topics)
-
-		# transpose dataframe
-		df = df.transpose()
+		# get the cumulative topic distribution per year (copy, so changing the columns does not alter the cached dataframe)
+		df = self._year_topic_df().copy()
 
 		# change column headers into topic labels
-		df.columns = [get_topic_label(x) for x in df.columns.values]
+		df.columns = [self._labels[x] for x in df.columns.values]
 		
 		# plot the dataframe
 		ax = df.plot(figsize = (15, 8), kind = 'area', colormap='Spectral_r', rot = 45, grid = False)
@@ -273,69 +310,43 @@ class Interpretation():
 
 		logging.info('Start {}'.format(sys._getframe().f_code.co_name))
 
-		# load docs
-		D = self.db.read_collection(collection = 'publications')
-
-		# create empty dictionary where we can store the dominant topic id and remaining other proportions
-		dominant_id_to_topics = {}
-
-		for d in D:
+		# load the topic distributions of all documents
+		self._load_topic_matrix()
 
-			# sort topics and create list
-			topics = [value for key, value in sorted(d['topics'].iteritems(), key=lambda x: int(x[0]))]
+		# number of topics
+		K = self._T.shape[1]
 
-			# get max topix id
-			max_topic_id = topics.index(max(topics))
+		# sum the topic distributions per dominant topic ID (row = dominant topic ID)
+		sums = np.zeros((K, K), dtype = np.float64)
+		np.add.at(sums, self._dominant, self._T)
 
-			# check if topic ID key already created
-			if max_topic_id not in dominant_id_to_topics:
-				dominant_id_to_topics[max_topic_id] = []
+		# number of documents per dominant topic ID
+		counts = np.bincount(self._dominant, minlength = K)
 
-			dominant_id_to_topics[max_topic_id].append(topics)
+		# calculate the cumulative topic distribution per dominant topic ID (topics that are never dominant stay zero)
+		coocc = (sums / np.maximum(counts, 1)[:, np.newaxis]) * 100.
 
-		# create empty dictionary where we can have the cumulative topic distribution per dominant topic ID
-		dominant_id_to_cum_topics = {}
-		for k, v in dominant_id_to_topics.iteritems():
+		# matrix with the topics as rows and the dominant topic IDs as columns
+		M = coocc.T
 
-			# calculate mean and add to dictionary
-			dominant_id_to_cum_topics[k] = np.mean(np.array(v), axis=0) * 100. 
+		# topic labels
+		labels = self._labels
 
+		# max value of each row, so we can sort on it (taken before the self co-occurrence is set to zero)
+		row_max = M.max(axis = 1)
 
-		# convert dictionary to pandas dataframe
-		df = pd.DataFrame.from_dict(dominant_id_to_cum_topics)
+		# make self co-occurrence zero
+		np.fill_diagonal(M, 0.0)
 
-		# change column headers into topic labels
-		df.columns = [get_topic_label(x) for x in df.columns.values]
-		df.index = [get_topic_label(x) for x in df.index.values]
-
-		# create max column
-		df['max'] = 0.
-
-		# keep track of new index
-		new_index = []
+		# sort rows by max value and columns by label
+		row_order = np.argsort(-row_max, kind = 'mergesort')
+		column_order = np.argsort(labels, kind = 'mergesort')
 
-		# add max column so we can sort on it later
-		for index, row in df.iterrows():
+		# new index names with the max value of each row
+		new_index = ['{} ({}%)'.format(labels[i], round(row_max[i], 2)) for i in row_order]
 
-			# add value to max column
-			df['max'][index] = max(row)
-			# make self co-occurrence zero
-			df[index][index] = 0.0
-
-			# add new index names to tracker so we can rename it later
-			new_index.append('{} ({}%)'.format(index, round(max(row), 2)))
-			
-		# update index name
-		df.index = new_index
-
-		# sort by max column
-		df = df.sort_values(by=['max'], ascending=False)
-
-		# delete max column
-		df = df.drop(['max'], axis=1)
-
-		# sort based on column totals
-		df = df.reindex(sorted(df.columns), axis=1)
+		# convert to pandas dataframe
+		df = pd.DataFrame(M[row_order][:, column_order], index = new_index, columns = [labels[j] for j in column_order])
 
 		# plot the heatmap
 		ax = sns.heatmap(df, cmap = "Blues", annot = True, vmin = 0., vmax = 10., square = True, annot_kws = {"size": 11},
@@ -366,44 +377,21 @@ class Interpretation():
 
 		logging.info('Start {}'.format(sys._getframe().f_code.co_name))
 		
-		# create dictionary where we have key = journal, and value = [topic_distributions]
-		journal_to_topics = {}
-
-		# load documents from database
-		D = self.db.read_collection(collection = 'publications')
-
-		# loop over the documents, read in the topic distribution, and add to the correct journal key
-		for i, d in enumerate(D):
-
-			# verbose process every 1000th document
-			if i % 1000 == 0: logging.debug('Processing document {}/{}'.format(i, D.count()))
+		# load the topic distributions of all documents
+		self._load_topic_matrix()
 
-			# get the name of the journal
-			journal = d['journal']
+		# convert each journal into a code, journals are sorted by name
+		codes, journals = pd.factorize(self._journals, sort = True)
 
-			# check if topics are created
-			if d.get('topics') is not None:
+		# sum the topic distributions per journal
+		sums = np.zeros((len(journals), self._T.shape[1]), dtype = np.float64)
+		np.add.at(sums, codes, self._T)
 
-				# add journal as key to the dictionary if not already exists
-				if journal not in journal_to_topics:
-					
-					# add journal as key with empty list
-					journal_to_topics[journal] = []
+		# get cumulative topic distributions for each journal: divide by the number of documents per journal
+		means = sums / np.bincount(codes, minlength = len(journals))[:, np.newaxis]
 
-				# sort topics and create as list
-				topics = [value for key, value in sorted(d['topics'].iteritems(), key=lambda x: int(x[0]))]
-
-				# append topic distribution to dictionary
-				journal_to_topics[journal].append(topics)
-
-		# get cumulative topic distributions for each journa
-		journal_to_cum_topics = get_journal_to_cum_topics(journal_to_topics)
-
-		# convert to Pandas DataFrame
-		df = pd.DataFrame.from_dict(journal_to_cum_topics).T
-
-		# change column labels to topic labels
-		df.columns = [get_topic_label(x) for x in df.columns.values]
+		# convert to Pandas DataFrame with topic labels as columns
+		df = pd.DataFrame(means, index = journals, columns = self._labels)
 
 		# plot the heatmap
 		ax = sns.heatmap(df, cmap = "Blues", annot = True, vmin = 0., vmax = .3, square = True, annot_kws = {"size": 11}, fmt = '.2f', mask= df <= 0.0, linewidths = .5, cbar = False, yticklabels = True)
@@ -422,107 +410,366 @@ class Interpretation():
 		plt.close()
 
 
+	def _year_topic_df(self):
+
+		"""
+			Return the cumulative topic distribution per year (the average topic distribution of all publications within that year) as a dataframe 
+			with the years as rows and the topic IDs as columns. The dataframe is calculated once and shared by the plots over time.
+		"""
+
+		if self._year_topic is None:
+
+			# load the topic distributions of all documents
+			self._load_topic_matrix()
+
+			# calculate the cumulative topic distribution: basically the average distribution per year
+			years, means = get_group_means(self._years, self._T)
+
+			# convert to pandas dataframe
+			self._year_topic = pd.DataFrame(means, index = years)
+
+		return self._year_topic
+
+
+	def _load_topic_matrix(self):
+
+		"""
+			Read the topic distributions of all publications once and stack them into a (N,K) matrix, together with the year, journal, title and dominant 
+			topic of each publication. The plot functions all work on this matrix, so the publications collection only needs to be read once.
+			The matrix and meta data are saved to the cache folder, and memory-mapped from there in later runs as long as the number of rows matches the database.
+		"""
+
+		# matrix already loaded
+		if self._T is not None:
+			return
+
+		# location of the topic matrix and its meta data on disk
+		matrix_path = os.path.join(self.cache_folder, 'topics.npy')
+		meta_path = os.path.join(self.cache_folder, 'topics-meta.csv')
+
+		# only use the topic matrix on disk if it has the same number of publications as the database
+		cache_valid = False
+
+		if os.path.exists(matrix_path) and os.path.exists(meta_path):
+
+			# memory-map the topic matrix, so only the pages that are used are read from disk
+			T = np.load(matrix_path, mmap_mode = 'r')
+
+			# number of publications with an inferred topic distribution
+			total = self.db.count_documents(collection = 'publications', filter = {'topics_vec' : {'$exists' : True}})
+
+			if T.shape[0] == total:
+
+				logging.info('Loading topic matrix from {}'.format(matrix_path))
+
+				self._T = T
+
+				# read the meta data of each publication (keep_default_na and dtype so titles and journals such as 'NA' or '1990' stay strings)
+				meta = pd.read_csv(meta_path, keep_default_na = False, dtype = {'journal' : str, 'title' : str})
+				self._years = meta['year'].to_numpy(dtype = np.int32)
+				self._journals = meta['journal'].to_numpy(dtype = object)
+				self._titles = meta['title'].to_numpy(dtype = object)
+
+				cache_valid = True
+
+			else:
+				logging.info('Topic matrix on disk does not match the publications collection, rebuilding ...')
+
+				# release the memory-mapped file so it can be overwritten
+				del T
+
+		if not cache_valid:
+
+			# load docs
+			D = self.db.read_collection(collection = 'publications', projection = {'topics_vec' : 1, 'journal' : 1, 'year' : 1, 'title' : 1, '_id' : 0}, batch_size = 1000)
+
+			# keep track of the year, journal, title and topic distribution of each document
+			years, journals, titles, topics = [], [], [], []
+
+			for d in D:
+
+				# check if topics are created
+				if d.get('topics_vec') is not None:
+
+					years.append(int(d['year']))
+					journals.append(d['journal'])
+					titles.append(d['title'])
+					topics.append(np.frombuffer(d['topics_vec'], dtype = np.float32))
+
+			# check if topic distributions are inferred (publications inferred before topics_vec was introduced only have a topics dictionary)
+			if not topics:
+				logging.error('No inferred topic distributions (topics_vec) found, re-run infer_document_topic_distribution')
+				exit(1)
+
+			# stack into numpy arrays
+			self._T = np.stack(topics)
+			self._years = np.asarray(years, dtype = np.int32)
+			self._journals = np.asarray(journals, dtype = object)
+			self._titles = np.asarray(titles, dtype = object)
+
+			# save the topic matrix and meta data to disk so the next run does not have to read the publications collection again
+			create_directory(self.cache_folder)
+			np.save(matrix_path, self._T)
+			pd.DataFrame({'year' : self._years, 'journal' : self._journals, 'title' : self._titles}).to_csv(meta_path, index = False)
+
+		# dominant topic of each publication
+		self._dominant = self._T.argmax(axis = 1)
+
+		# label of each topic
+		self._labels = [get_topic_label(k) for k in range(self._T.shape[1])]
+
+
 """ 
 
 internal helper function
 
 """
 
-def print_doc_verbose(i, total, journal, year, title):
+def get_inference_batches(D, batch_size, total):
+
+	"""
+		Read the documents and group them into batches that can be inferred by the LDA model
+
+		Parameters
+		----------
+		D : pymongo cursor
+			documents with tokens
+		batch_size : int
+			number of documents within a batch
+		total : int
+			total number of documents, only used to print the progress
+
+		Yields
+		---------
+		batch : tuple
+			list of meta data (journal, year, title) and list of tokens, one for each document in the batch
+	"""
+
+	# keep track of the documents (meta data and tokens) that still need to be inferred
+	batch_meta, batch_tokens = [], []
+
+	# loop through all the documents to infer document-topics distribition
+	for i, d in enumerate(D):
+
+		# check if tokens are present; in case some documents couldn't properly be tokenized during pre-processing phase
+		if d.get('tokens') is not None:
+
+			# verbose process every 1000th document (lazy formatting, so nothing is formatted if debug logging is disabled)
+			if i % 1000 == 0: logging.debug('processing file: %d/%d %s', i + 1, total, d['title'])
+
+			# keep the tokens, the bag of words is created within the worker process
+			batch_tokens.append(d['tokens'])
+
+			# keep the meta data so we can create a new document to add to the database, this time in a different collection
+			batch_meta.append({'journal': d['journal'], 'year' : d['year'], 'title' : d['title']})
+
+			# full batch of documents
+			if len(batch_tokens) >= batch_size:
 
-	# console output
-	logging.debug('processing file: {}/{}'.format(i+1,total))
-	logging.debug('journal : {}'.format(journal))
-	logging.debug('year : {}'.format(year))
-	logging.debug('title : {}'.format(title))
+				yield batch_meta, batch_tokens
+				batch_meta, batch_tokens = [], []
 
+	# the remaining documents
+	if batch_tokens:
+		yield batch_meta, batch_tokens
 
-def get_year_to_topics(D):
 
+def init_inference_worker(model_location):
 
 	"""
-		Create dictionary where we group all the document-topic distributions per year 
+		Load the LDA model within a worker process, so it is only loaded once per worker and not sent with every batch
+
+		Parameters
+		----------
+		model_location : os.path()
+			location of LDA Model
 	"""
 
-	# create the empty dictionary
-	year_to_topics = {}
+	global worker_model
+	worker_model = load_lda_model(model_location)
 
-	# loop trough documents and create the dictionary
-	for d in D:
 
-		# check if year key already created
-		if int(d['year']) not in year_to_topics:
-			year_to_topics[int(d['year'])] = []
+def infer_batch_worker(batch):
 
-		# sort topics and create list
-		topics = [value for key, value in sorted(d['topics'].iteritems(), key=lambda x: int(x[0]))]
-		
-		# add topic distribution to year key
-		year_to_topics[int(d['year'])].append(topics)
+	"""
+		Infer the document-topic distributions of a batch of documents within a worker process
+
+		Parameters
+		----------
+		batch : tuple
+			list of meta data and list of tokens, one for each document in the batch
+
+		Returns
+		---------
+		batch_meta : list of dictionaries
+			meta data of each document
+		gamma : np.array
+			array with a row per document that contains the normalized topic distribution
+	"""
+
+	batch_meta, batch_tokens = batch
+
+	# create bag of words with the dictionary the LDA model was trained with, so the token IDs match the topic-word distributions of the model
+	token2id = worker_model.id2word.token2id
+	batch_bows = [fast_doc2bow(tokens, token2id) for tokens in batch_tokens]
+
+	return batch_meta, infer_topic_distributions(worker_model, batch_bows)
+
+
+def fast_doc2bow(tokens, token2id):
+
+	"""
+		Create bag of words from tokens. Same output as doc2bow from the gensim dictionary, but counts the token IDs in a numba compiled loop
+
+		Parameters
+		----------
+		tokens : list of strings
+			tokens of the document
+		token2id : dictionary
+			dictionary with key = token and value = token ID
+
+		Returns
+		---------
+		bow : list of tuples
+			(token ID, count) for each unique token that is in the dictionary, sorted by token ID
+	"""
+
+	# map tokens to token IDs, tokens that are not in the dictionary become -1
+	token_ids = np.fromiter((token2id.get(t, -1) for t in tokens), dtype = np.int64, count = len(tokens))
 
-	return year_to_topics
+	# count the token IDs (compiled loop)
+	ids, counts = count_token_ids(token_ids)
 
+	return list(zip(ids.tolist(), counts.tolist()))
 
-def get_year_to_cum_topics(year_to_topics):
+
+def infer_topic_distributions(model, bows):
 
 	"""
-		Create dictionary where we obtain the cumulative document-topic distributions per year 
-		cumulative document-topic distributions are mean values for each topic
+		Infer the document-topic distributions for a batch of documents in one go. Calls the variational inference of the model directly
+		without collecting sufficient statistics (get_document_topics computes them for every document, which is not needed here)
 
+		Parameters
+		----------
+		model : gensim.models.LdaModel
+			trained gensim lda model
+		bows : list of lists
+			bag of words representation of each document
+
+		Returns
+		---------
+		gamma : np.array
+			array with a row per document that contains the normalized topic distribution
+	"""
+
+	# variational parameters of the documents
+	gamma, _ = model.inference(bows, collect_sstats = False)
+
+	# normalize so each row sums up to one
+	return normalize_rows(gamma)
+
+
+@njit(cache = True)
+def count_token_ids(token_ids):
+
+	"""
+		Count the occurrences of each token ID, token IDs below zero (tokens not in the dictionary) are skipped
 
 		Parameters
 		----------
-		year_to_topics : dictionary
-			dictionary with key = year and value = list of sorted topic distributions
+		token_ids : np.array
+			token ID of each token in the document
 
 		Returns
 		---------
-		year_to_cum_topics : dictionary
-			dictionary with key = year and value = cumulative topic distribution, meaning the mean of all topic distributions from that journal
+		ids : np.array
+			sorted unique token IDs
+		counts : np.array
+			number of occurrences of each token ID
 	"""
 
-	# create empty dictionay
-	year_to_cum_topics = {}
+	# hash table with key = token ID and value = count
+	token_counts = Dict.empty(key_type = types.int64, value_type = types.int64)
 
-	# loop over year_to_topics dictionary are calculate mean of topics
-	for k, v in year_to_topics.iteritems():
+	for t in token_ids:
+		if t >= 0:
+			token_counts[t] = token_counts.get(t, 0) + 1
 
-		# calculate the column mean
-		mean_topics = np.mean(np.array(v), axis = 0)
-		
-		# add to dictionary so we can obtain it later on
-		year_to_cum_topics[k] = mean_topics
-	
+	# convert to arrays
+	ids = np.empty(len(token_counts), dtype = np.int64)
+	counts = np.empty(len(token_counts), dtype = np.int64)
 
-	return year_to_cum_topics
+	j = 0
+	for t, c in token_counts.items():
+		ids[j] = t
+		counts[j] = c
+		j += 1
 
-def get_journal_to_cum_topics(journal_to_topics):
+	# sort by token ID
+	order = np.argsort(ids)
+
+	return ids[order], counts[order]
+
+
+@njit(cache = True)
+def normalize_rows(gamma):
 
 	"""
-		Create a dictionary with the cumulative topic distribution of a journal
+		Normalize each row of gamma in place so it sums up to one
 
 		Parameters
 		----------
-		journal_to_topics : dictionary
-			dictionary with key = journal and value = list of sorted topic distributions
+		gamma : np.array
+			array with a row per document that contains the variational parameters
 
 		Returns
 		---------
-		journal_to_cum_topics : dictionary
-			dictionary with key = journal and value = cumulative topic distribution, meaning the mean of all topic distributions from that journal
+		gamma : np.array
+			array with a row per document that contains the normalized topic distribution
 	"""
 
-	# create empty dictionay
-	journal_to_cum_topics = {}
+	for i in range(gamma.shape[0]):
 
-	# loop over year_to_topics dictionary are calculate mean of topics
-	for k, v in journal_to_topics.iteritems():
+		# row total
+		s = 0.0
+		for k in range(gamma.shape[1]):
+			s += gamma[i, k]
 
-		# calculate the column mean
-		mean_topics = np.mean(np.array(v), axis = 0)
-		
-		# add to dictionary with key = journal and value = cumulative topic distribution
-		journal_to_cum_topics[k] = mean_topics
-	
-	return journal_to_cum_topics
+		# divide by row total
+		for k in range(gamma.shape[1]):
+			gamma[i, k] /= s
+
+	return gamma
+
+
+def get_group_means(groups, topics):
+
+	"""
+		Calculate the mean topic distribution of each group (e.g. year or journal) in a single pass over the topic matrix
+
+		Parameters
+		----------
+		groups : np.array
+			group of each document
+		topics : np.array
+			matrix with a row per document that contains the topic distribution
+
+		Returns
+		---------
+		unique_groups : np.array
+			sorted unique groups
+		means : np.array
+			matrix with a row per group that contains the mean topic distribution
+	"""
+
+	# sort documents by group so documents of the same group are next to each other
+	order = np.argsort(groups, kind = 'mergesort')
+
+	# get the unique groups, the row where each group starts, and the number of documents within each group
+	unique_groups, group_starts, counts = np.unique(groups[order], return_index = True, return_counts = True)
+
+	# sum the topic distributions of each group (in float64) and divide by the number of documents
+	sums = np.add.reduceat(topics[order].astype(np.float64), group_starts, axis = 0)
+
+	return unique_groups, sums / counts[:, np.newaxis]
 
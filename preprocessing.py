@@ -64,10 +64,6 @@ class Preprocessing():
 		# instantiate database
 		self.db = MongoDatabase()
 
-		# set utf8 encoding
-		reload(sys)
-		sys.setdefaultencoding('utf8')
-
 	def full_text_preprocessing(self, pdf_folder = os.path.join('files', 'pdf')):
 
 
@@ -178,6 +174,9 @@ class Preprocessing():
 		# read document collection
 		D = self.db.read_collection(collection = 'publications_raw')
 
+		# total number of documents, only used to print the progress
+		total = self.db.count_documents(collection = 'publications_raw')
+
 		# setup spacy natural language processing object
 		nlp = setup_spacy()
 
@@ -188,7 +187,7 @@ class Preprocessing():
 			if d.get('tokens') is None:
 
 				# print to console
-				print_doc_verbose(i, D.count(), d['journal'], d['year'], d['title'])
+				print_doc_verbose(i, total, d['journal'], d['year'], d['title'])
 
 				# get content from document and convert to spacy object
 				content = nlp(d['content'])
@@ -237,8 +236,8 @@ def setup_spacy():
 	# add some more stopwords; apparently spacy does not contain all the stopwords
 	for word in set(stopwords.words('english')):
 
-		nlp.Defaults.stop_words.add(unicode(word))
-		nlp.Defaults.stop_words.add(unicode(word.title()))
+		nlp.Defaults.stop_words.add(word)
+		nlp.Defaults.stop_words.add(word.title())
 
 	for word in nlp.Defaults.stop_words:
 		lex = nlp.vocab[word]
@@ -11,7 +11,7 @@
 	Syed, S., & Weber, C. T. (2018). Using Machine Learning to Uncover Latent Research Topics in Fishery Models. Reviews in Fisheries Science & Aquaculture, 26(3), 319–336. http://doi.org/10.1080/23308249.2017.1416331
 
 	PACKAGES NEEDED TO INSTALL: 
-	requests, textract, glob2, csv, datetime, spacy, nltk, gensim, itemgetter, matplotlib, seaborn, pandas, numpy, pymongo, collections, itertools, re, logging, os, sys
+	requests, textract, glob2, csv, datetime, spacy, nltk, gensim, itemgetter, matplotlib, seaborn, pandas, numpy, numba, pymongo, collections, itertools, re, logging, os, sys
 
 	
 	- Install spacy with the following commands: